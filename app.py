@@ -2,12 +2,14 @@ from flask import Flask, render_template, request, jsonify
 import google.generativeai as genai
 import os
 from config import config
+from logging_config import configure_logging
 from models import db
 import json
 from datetime import datetime
 
 def create_app():
     """Application factory pattern"""
+    configure_logging()
     app = Flask(__name__)
     
     # Load configuration
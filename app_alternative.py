@@ -3,27 +3,129 @@ Alternative Flask app using direct HTTP requests to Gemini API.
 This version might help with quota issues and provides more control.
 """
 
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, render_template, request, jsonify, stream_with_context
+from flask.json.provider import JSONProvider, DefaultJSONProvider
+from flask_compress import Compress
+from werkzeug.middleware.proxy_fix import ProxyFix
+import orjson
+import hashlib
+import logging
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from config import config
-from models import db
+from logging_config import configure_logging
+from models import db, message_writer
 from gemini_client import GeminiClient
+from rate_limiter import rate_limiter
 from datetime import datetime
+import time
+
+logger = logging.getLogger(__name__)
+
+# Database saves run here so responses never wait on the write
+_save_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='db-save')
+
+def _safe_save(user_message, ai_response):
+    """Save a chat exchange from the background pool, logging any failure"""
+    try:
+        message_writer.save_message(user_message, ai_response)
+    except Exception:
+        logger.exception("Error saving message to database")
+
+# Timestamp string reused for every request within the same second
+_ts_cache = {'sec': 0, 'str': ''}
+
+def fast_now_iso():
+    """Return the current local time in ISO format at second resolution"""
+    now = int(time.time())
+    cache = _ts_cache
+    if cache['sec'] != now:
+        cache['str'] = datetime.fromtimestamp(now).isoformat()
+        cache['sec'] = now
+    return cache['str']
+
+# Pre-encoded health response; the timestamp and flags are spliced in per request
+_HEALTH_TEMPLATE = b'{"status":"healthy","timestamp":"%b","database_connected":%b,"ai_available":%b}'
+
+# Pre-encoded body for the most common validation error
+_EMPTY_MESSAGE_BODY = b'{"error":"Message cannot be empty"}'
+
+def read_user_message():
+    """Return the stripped chat message from the JSON body, or '' if missing or malformed"""
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return ''
+    message = data.get('message')
+    return message.strip() if isinstance(message, str) else ''
+
+def empty_message_response():
+    """Build the 400 response for an empty or missing message"""
+    return Response(_EMPTY_MESSAGE_BODY, status=400, mimetype='application/json')
+
+# Minimum characters per SSE frame, so small deltas are not sent one event each
+STREAM_MIN_FRAME_CHARS = 50
+
+# Static parts of the assistant prompt, built once at import time
+_PROMPT_PREFIX = (
+    "You are a helpful AI assistant. Please respond to the following message "
+    "in a friendly and informative way:\n\nUser: "
+)
+_PROMPT_SUFFIX = "\n\nPlease keep your response concise and helpful."
+
+def build_prompt(user_message):
+    """Wrap a user message in the assistant prompt"""
+    return _PROMPT_PREFIX + user_message + _PROMPT_SUFFIX
+
+def sse_event(payload):
+    """Encode a payload as a Server-Sent Events data frame"""
+    return b"data: " + orjson.dumps(payload) + b"\n\n"
+
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider backed by orjson"""
+    
+    def dumps(self, obj, **kwargs):
+        """Serialize obj to a JSON string"""
+        return orjson.dumps(obj, default=DefaultJSONProvider.default).decode()
+    
+    def loads(self, s, **kwargs):
+        """Deserialize a JSON string or bytes"""
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        """Build a JSON response without an intermediate str"""
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=DefaultJSONProvider.default)
+        return self._app.response_class(body, mimetype='application/json')
 
 def create_app():
     """Application factory pattern with direct API client"""
+    configure_logging()
     app = Flask(__name__)
+    app.json = OrjsonProvider(app)
     
     # Load configuration
     config_name = os.environ.get('FLASK_ENV', 'development')
     app.config.from_object(config[config_name])
     
+    # Nginx appends the client address to X-Forwarded-For; trust that one hop only
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=1)
+    
+    # Compress large JSON and HTML responses
+    Compress(app)
+    
     # Initialize Gemini AI client
     if app.config['GEMINI_API_KEY']:
-        app.gemini_client = GeminiClient(app.config['GEMINI_API_KEY'])
-        print("✅ Gemini API client initialized")
+        app.gemini_client = GeminiClient(
+            app.config['GEMINI_API_KEY'],
+            cache_size=app.config['GEMINI_CACHE_SIZE'],
+            cache_ttl=app.config['GEMINI_CACHE_TTL']
+        )
+        logger.info("Gemini API client initialized")
+        # Pay the TLS handshake now rather than on the first user request
+        threading.Thread(target=app.gemini_client.warmup, name='gemini-warmup', daemon=True).start()
     else:
-        print("Warning: GEMINI_API_KEY not found. AI features will not work.")
+        logger.warning("GEMINI_API_KEY not found. AI features will not work.")
         app.gemini_client = None
     
     # Initialize database
@@ -32,59 +134,126 @@ def create_app():
         if db.connect():
             db.create_tables()
         else:
-            print("Warning: Could not connect to database. Chat history will not be saved.")
+            logger.warning("Could not connect to database. Chat history will not be saved.")
     
     # Initialize database on app creation
     initialize_database()
     
+    # Bind hot-path dependencies once so request handlers read plain closure variables
+    gemini_client = app.gemini_client
+    generate_content = gemini_client.generate_content if gemini_client else None
+    stream_content = gemini_client.stream_content if gemini_client else None
+    ai_available = gemini_client is not None
+    submit_save = _save_pool.submit
+    is_allowed = rate_limiter.is_allowed
+    get_retry_after = rate_limiter.get_retry_after
+    debug = app.debug
+    
+    # Render the index page once at startup outside debug mode; url_for needs a request context
+    if not debug:
+        with app.test_request_context('/'):
+            index_body = render_template('index.html').encode()
+        index_etag = hashlib.md5(index_body).hexdigest()
+    
     @app.route('/')
     def index():
         """Main chat page"""
-        return render_template('index.html')
+        if debug:
+            return render_template('index.html')
+        
+        response = Response(index_body, mimetype='text/html')
+        response.set_etag(index_etag)
+        response.headers['Cache-Control'] = 'public, max-age=300'
+        return response.make_conditional(request)
+    
+    def check_rate_limit():
+        """Return a 429 response if the client is over its limit, else None"""
+        client_ip = request.remote_addr
+        if not is_allowed(client_ip):
+            retry_after = get_retry_after(client_ip)
+            return jsonify({'error': 'Too many requests. Please slow down.'}), 429, {'Retry-After': str(retry_after)}
+        return None
+    
+    def save_chat_message(user_message, ai_response):
+        """Hand a chat exchange to the background save pool if the database is available"""
+        if db.connection:
+            submit_save(_safe_save, user_message, ai_response)
     
     @app.route('/api/chat', methods=['POST'])
     def chat():
         """Handle chat messages and return AI response"""
-        try:
-            data = request.get_json()
-            user_message = data.get('message', '').strip()
-            
-            if not user_message:
-                return jsonify({'error': 'Message cannot be empty'}), 400
-            
-            # Get AI response using direct API client
-            if app.gemini_client:
-                try:
-                    # Create a prompt for the AI
-                    prompt = f"""You are a helpful AI assistant. Please respond to the following message in a friendly and informative way:
-
-User: {user_message}
-
-Please keep your response concise and helpful."""
-                    
-                    ai_response = app.gemini_client.generate_content(prompt)
-                except Exception as e:
-                    print(f"Error generating AI response: {e}")
-                    ai_response = "I'm sorry, I'm having trouble processing your request right now. Please try again later."
-            else:
-                ai_response = "AI service is not available. Please check the API key configuration."
-            
-            # Save to database
-            if db.connection:
-                try:
-                    db.save_message(user_message, ai_response)
-                except Exception as e:
-                    print(f"Error saving message to database: {e}")
-            
-            return jsonify({
-                'user_message': user_message,
-                'ai_response': ai_response,
-                'timestamp': datetime.now().isoformat()
-            })
+        user_message = read_user_message()
+        if not user_message:
+            return empty_message_response()
+        
+        limited = check_rate_limit()
+        if limited:
+            return limited
+        
+        # Get AI response using direct API client
+        if generate_content:
+            try:
+                # Create a prompt for the AI
+                prompt = build_prompt(user_message)
+                
+                ai_response = generate_content(prompt)
+            except Exception:
+                logger.exception("Error generating AI response")
+                ai_response = "I'm sorry, I'm having trouble processing your request right now. Please try again later."
+        else:
+            ai_response = "AI service is not available. Please check the API key configuration."
+        
+        # Save to database
+        save_chat_message(user_message, ai_response)
+        
+        return jsonify({
+            'user_message': user_message,
+            'ai_response': ai_response,
+            'timestamp': fast_now_iso()
+        })
+    
+    @app.route('/api/chat/stream', methods=['POST'])
+    def chat_stream():
+        """Stream the AI response to a chat message as Server-Sent Events"""
+        user_message = read_user_message()
+        if not user_message:
+            return empty_message_response()
+        
+        limited = check_rate_limit()
+        if limited:
+            return limited
+        
+        def generate():
+            parts = []
+            pending = ''
+            try:
+                if stream_content:
+                    deltas = stream_content(build_prompt(user_message))
+                else:
+                    deltas = ["AI service is not available. Please check the API key configuration."]
+                
+                # Group small deltas into larger frames
+                for delta in deltas:
+                    parts.append(delta)
+                    pending += delta
+                    if len(pending) >= STREAM_MIN_FRAME_CHARS:
+                        yield sse_event({'delta': pending})
+                        pending = ''
+                if pending:
+                    yield sse_event({'delta': pending})
+            except Exception:
+                logger.exception("Error streaming AI response")
+                yield sse_event({'error': "I'm sorry, I'm having trouble processing your request right now. Please try again later."})
+                return
             
-        except Exception as e:
-            print(f"Error in chat endpoint: {e}")
-            return jsonify({'error': 'Internal server error'}), 500
+            save_chat_message(user_message, ''.join(parts))
+            yield sse_event({'done': True, 'timestamp': fast_now_iso()})
+        
+        return Response(
+            stream_with_context(generate()),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
     
     @app.route('/api/history', methods=['GET'])
     def get_chat_history():
@@ -93,32 +262,24 @@ Please keep your response concise and helpful."""
             limit = request.args.get('limit', 10, type=int)
             messages = db.get_recent_messages(limit) if db.connection else []
             
-            # Convert to list of dictionaries
-            history = []
-            for msg in messages:
-                history.append({
-                    'id': msg['id'],
-                    'user_message': msg['user_message'],
-                    'ai_response': msg['ai_response'],
-                    'timestamp': msg['timestamp'].isoformat()
-                })
+            # Rows are dicts and orjson writes datetimes in ISO format, so they serialize as-is
+            return jsonify({'messages': messages})
             
-            return jsonify({'messages': history})
-            
-        except Exception as e:
-            print(f"Error getting chat history: {e}")
+        except Exception:
+            logger.exception("Error getting chat history")
             return jsonify({'error': 'Internal server error'}), 500
     
+    ai_available_json = b'true' if ai_available else b'false'
+    
     @app.route('/api/health', methods=['GET'])
     def health_check():
         """Health check endpoint"""
-        status = {
-            'status': 'healthy',
-            'timestamp': datetime.now().isoformat(),
-            'database_connected': db.connection is not None,
-            'ai_available': app.gemini_client is not None
-        }
-        return jsonify(status)
+        body = _HEALTH_TEMPLATE % (
+            fast_now_iso().encode(),
+            b'true' if db.connection is not None else b'false',
+            ai_available_json
+        )
+        return Response(body, mimetype='application/json')
     
     @app.errorhandler(404)
     def not_found(error):
@@ -5,8 +5,8 @@ Run this script to see which models are available with your API key.
 """
 
 import os
-import google.generativeai as genai
 from dotenv import load_dotenv
+from gemini_client import GeminiClient
 
 def check_available_models():
     """Check and display available Gemini models."""
@@ -20,14 +20,13 @@ def check_available_models():
         return
     
     try:
-        # Configure the API
-        genai.configure(api_key=api_key)
+        client = GeminiClient(api_key)
         
         print("🔍 Checking available Gemini models...")
         print("=" * 60)
         
         # List all models
-        models = list(genai.list_models())
+        models = client.list_models()
         
         if not models:
             print("❌ No models found. Check your API key and internet connection.")
@@ -41,7 +40,7 @@ def check_available_models():
         other_models = []
         
         for model in models:
-            if "generateContent" in model.supported_generation_methods:
+            if "generateContent" in model.get('supportedGenerationMethods', []):
                 generate_content_models.append(model)
             else:
                 other_models.append(model)
@@ -51,10 +50,10 @@ def check_available_models():
             print("🤖 Models that support generateContent (recommended for chat):")
             print("-" * 50)
             for model in generate_content_models:
-                print(f"  • {model.name}")
-                if hasattr(model, 'display_name'):
-                    print(f"    Display Name: {model.display_name}")
-                print(f"    Supported Methods: {', '.join(model.supported_generation_methods)}")
+                print(f"  • {model['name']}")
+                if 'displayName' in model:
+                    print(f"    Display Name: {model['displayName']}")
+                print(f"    Supported Methods: {', '.join(model.get('supportedGenerationMethods', []))}")
                 print()
         
         # Display other models
@@ -62,21 +61,21 @@ def check_available_models():
             print("🔧 Other available models:")
             print("-" * 30)
             for model in other_models:
-                print(f"  • {model.name}")
-                if hasattr(model, 'display_name'):
-                    print(f"    Display Name: {model.display_name}")
-                print(f"    Supported Methods: {', '.join(model.supported_generation_methods)}")
+                print(f"  • {model['name']}")
+                if 'displayName' in model:
+                    print(f"    Display Name: {model['displayName']}")
+                print(f"    Supported Methods: {', '.join(model.get('supportedGenerationMethods', []))}")
                 print()
         
         # Recommend a model
         if generate_content_models:
             recommended = None
             for model in generate_content_models:
-                if 'flash' in model.name.lower():
-                    recommended = model.name
+                if 'flash' in model['name'].lower():
+                    recommended = model['name']
                     break
-                elif 'pro' in model.name.lower():
-                    recommended = model.name
+                elif 'pro' in model['name'].lower():
+                    recommended = model['name']
                     break
             
             if recommended:
@@ -103,14 +102,18 @@ def test_model(model_name):
         return
     
     try:
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel(model_name)
+        client = GeminiClient(api_key)
         
         print(f"🧪 Testing model: {model_name}")
-        response = model.generate_content("Hello, how are you?")
+        # The API lists models as "models/<id>"; the client expects just the id
+        model_id = model_name[len('models/'):] if model_name.startswith('models/') else model_name
+        response = client.probe_model(model_id, "Hello, how are you?")
+        if response is None:
+            print("❌ Model test failed: the API returned an error (see log above)")
+            return
         
         print("✅ Model test successful!")
-        print(f"Response: {response.text}")
+        print(f"Response: {response}")
         
     except Exception as e:
         print(f"❌ Model test failed: {e}")
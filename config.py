@@ -10,6 +10,15 @@ class Config:
     GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY')
     DATABASE_URL = os.environ.get('DATABASE_URL') or 'postgresql://localhost/chatbot_db'
     
+    # Gemini response cache settings
+    GEMINI_CACHE_SIZE = int(os.environ.get('GEMINI_CACHE_SIZE') or 2048)
+    GEMINI_CACHE_TTL = int(os.environ.get('GEMINI_CACHE_TTL') or 900)
+    
+    # Response compression (Flask-Compress)
+    COMPRESS_MIMETYPES = ['application/json', 'text/html']
+    COMPRESS_MIN_SIZE = 512
+    COMPRESS_ALGORITHM = ['br', 'gzip']
+    
     # Flask settings
     FLASK_ENV = os.environ.get('FLASK_ENV') or 'development'
     DEBUG = FLASK_ENV == 'development'
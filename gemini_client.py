@@ -3,21 +3,107 @@ Alternative Gemini API client using direct HTTP requests.
 This can help with quota management and provides more control over API calls.
 """
 
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
 import requests
-import json
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import orjson
 import os
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterator
+
+logger = logging.getLogger(__name__)
+
+class ResponseCache:
+    """Thread-safe in-memory LRU cache with per-entry expiry"""
+    
+    def __init__(self, maxsize: int = 2048, ttl: int = 900):
+        """
+        Initialize response cache
+        
+        Args:
+            maxsize: Maximum number of entries kept (0 disables caching)
+            ttl: Seconds an entry stays valid
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[bytes, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: bytes) -> Optional[str]:
+        """Return the cached value for key, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+    
+    def set(self, key: bytes, value: str) -> None:
+        """Store value under key, evicting the least recently used entry if full"""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
 
 class GeminiClient:
     """Direct HTTP client for Gemini API"""
     
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, cache_size: int = 2048, cache_ttl: int = 900):
         self.api_key = api_key
         self.base_url = "https://generativelanguage.googleapis.com/v1beta"
         self.headers = {
             'Content-Type': 'application/json',
             'X-goog-api-key': api_key
         }
+        self._session = self._build_session()
+        self._cache = ResponseCache(maxsize=cache_size, ttl=cache_ttl)
+        self._inflight: Dict[bytes, Future] = {}
+        self._inflight_lock = threading.Lock()
+    
+    @staticmethod
+    def _cache_key(model: str, text: str) -> bytes:
+        """Build a cache key that ignores case and whitespace differences"""
+        normalized = " ".join(text.split()).lower()
+        return hashlib.blake2b(f"{model}\0{normalized}".encode(), digest_size=16).digest()
+    
+    @staticmethod
+    def _build_session() -> requests.Session:
+        """Create a pooled session so calls reuse keep-alive TLS connections"""
+        session = requests.Session()
+        # Retry connection failures and 5xx replies, which leave no generation
+        # running upstream. Never retry a read error or timeout: the POST may
+        # still be generating, and a retry would multiply the 30s timeout that
+        # callers waiting on an in-flight request rely on.
+        retries = Retry(
+            total=2,
+            read=0,
+            backoff_factor=0.2,
+            status_forcelist=[500, 502, 503, 504],
+            allowed_methods=None,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=retries)
+        session.mount('https://', adapter)
+        return session
+    
+    def warmup(self) -> None:
+        """Open a keep-alive TLS connection in the pool before the first real request"""
+        try:
+            self._session.head(f"{self.base_url}/models", headers=self.headers, timeout=10)
+        except requests.exceptions.RequestException as e:
+            logger.warning("Gemini connection warm-up failed: %s", e)
     
     def generate_content(self, text: str, model: str = "gemini-2.0-flash") -> Optional[str]:
         """
@@ -30,6 +116,54 @@ class GeminiClient:
         Returns:
             Generated text or None if error
         """
+        cache_key = self._cache_key(model, text)
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        # Identical prompts already in flight wait for that call instead of starting another
+        with self._inflight_lock:
+            future = self._inflight.get(cache_key)
+            is_leader = future is None
+            if is_leader:
+                future = Future()
+                self._inflight[cache_key] = future
+        
+        # The leader always resolves the future, and its own retries and timeouts bound the wait
+        if not is_leader:
+            return future.result()
+        
+        try:
+            result = self._request_content(text, model, cache_key)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(cache_key, None)
+    
+    def probe_model(self, model: str, text: str = "Hello, how are you?") -> Optional[str]:
+        """
+        Send one uncached request to check that a model works
+        
+        Args:
+            model: Model to test
+            text: Input text for the AI
+            
+        Returns:
+            Generated text, or None if the API call failed
+        """
+        return self._request_content(text, model, None, fallback=False)
+    
+    def _request_content(self, text: str, model: str, cache_key: Optional[bytes],
+                         fallback: bool = True) -> Optional[str]:
+        """Call generateContent and cache a successful response
+        
+        On failure, returns a user-facing fallback message, or None when fallback is False.
+        """
         url = f"{self.base_url}/models/{model}:generateContent"
         
         payload = {
@@ -45,48 +179,120 @@ class GeminiClient:
         }
         
         try:
-            response = requests.post(url, headers=self.headers, json=payload, timeout=30)
+            response = self._session.post(url, headers=self.headers, data=orjson.dumps(payload), timeout=30)
             
             if response.status_code == 200:
-                data = response.json()
+                data = orjson.loads(response.content)
                 if 'candidates' in data and len(data['candidates']) > 0:
                     candidate = data['candidates'][0]
                     if 'content' in candidate and 'parts' in candidate['content']:
-                        return candidate['content']['parts'][0]['text']
+                        result = candidate['content']['parts'][0]['text']
+                        if cache_key is not None:
+                            self._cache.set(cache_key, result)
+                        return result
             
             # Handle quota errors
             elif response.status_code == 429:
-                error_data = response.json()
-                print(f"Quota exceeded: {error_data.get('error', {}).get('message', 'Unknown error')}")
-                return "I'm sorry, I've reached my daily limit. Please try again later."
+                error_data = orjson.loads(response.content)
+                logger.warning("Quota exceeded: %s", error_data.get('error', {}).get('message', 'Unknown error'))
+                return "I'm sorry, I've reached my daily limit. Please try again later." if fallback else None
             
             # Handle other errors
             else:
-                print(f"API Error {response.status_code}: {response.text}")
-                return "I'm sorry, I'm having trouble processing your request right now."
+                logger.error("API Error %s: %s", response.status_code, response.text)
+                return "I'm sorry, I'm having trouble processing your request right now." if fallback else None
                 
         except requests.exceptions.RequestException as e:
-            print(f"Request error: {e}")
-            return "I'm sorry, I'm having trouble connecting to the AI service."
-        except Exception as e:
-            print(f"Unexpected error: {e}")
-            return "I'm sorry, something went wrong. Please try again."
+            logger.error("Request error: %s", e)
+            return "I'm sorry, I'm having trouble connecting to the AI service." if fallback else None
+        except Exception:
+            logger.exception("Unexpected error")
+            return "I'm sorry, something went wrong. Please try again." if fallback else None
     
-    def get_available_models(self) -> list:
-        """Get list of available models"""
+    def stream_content(self, text: str, model: str = "gemini-2.0-flash") -> Iterator[str]:
+        """
+        Stream generated content as it is produced
+        
+        Args:
+            text: Input text for the AI
+            model: Model to use (default: gemini-2.0-flash)
+            
+        Yields:
+            Text deltas in generation order. A connection error after the
+            first delta is re-raised, so callers can tell a cut-off answer
+            from a complete one.
+        """
+        cache_key = self._cache_key(model, text)
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            yield cached
+            return
+        
+        parts = []
+        
+        url = f"{self.base_url}/models/{model}:streamGenerateContent?alt=sse"
+        payload = {"contents": [{"parts": [{"text": text}]}]}
+        
+        try:
+            with self._session.post(url, headers=self.headers, data=orjson.dumps(payload), timeout=30, stream=True) as response:
+                if response.status_code == 429:
+                    logger.warning("Quota exceeded: %s", response.text)
+                    yield "I'm sorry, I've reached my daily limit. Please try again later."
+                    return
+                if response.status_code != 200:
+                    logger.error("API Error %s: %s", response.status_code, response.text)
+                    yield "I'm sorry, I'm having trouble processing your request right now."
+                    return
+                
+                for line in response.iter_lines(decode_unicode=True):
+                    if not line or not line.startswith('data:'):
+                        continue
+                    data = orjson.loads(line[5:])
+                    candidates = data.get('candidates') or [{}]
+                    for part in candidates[0].get('content', {}).get('parts', []):
+                        delta = part.get('text')
+                        if delta:
+                            parts.append(delta)
+                            yield delta
+                
+                if parts:
+                    self._cache.set(cache_key, ''.join(parts))
+                    
+        except requests.exceptions.RequestException as e:
+            logger.error("Request error: %s", e)
+            if parts:
+                raise
+            yield "I'm sorry, I'm having trouble connecting to the AI service."
+    
+    def list_models(self) -> list:
+        """
+        Get details of all available models
+        
+        Returns:
+            List of model resources (name, displayName, supportedGenerationMethods, ...)
+        """
         url = f"{self.base_url}/models"
+        models = []
+        params = {'pageSize': 1000}
         
         try:
-            response = requests.get(url, headers=self.headers, timeout=10)
-            if response.status_code == 200:
-                data = response.json()
-                return [model['name'] for model in data.get('models', [])]
-            else:
-                print(f"Error getting models: {response.status_code} - {response.text}")
-                return []
-        except Exception as e:
-            print(f"Error getting models: {e}")
+            while True:
+                response = self._session.get(url, headers=self.headers, params=params, timeout=10)
+                if response.status_code != 200:
+                    logger.error("Error getting models: %s - %s", response.status_code, response.text)
+                    return []
+                data = orjson.loads(response.content)
+                models.extend(data.get('models', []))
+                if not data.get('nextPageToken'):
+                    return models
+                params['pageToken'] = data['nextPageToken']
+        except Exception:
+            logger.exception("Error getting models")
             return []
+    
+    def get_available_models(self) -> list:
+        """Get list of available models"""
+        return [model['name'] for model in self.list_models()]
 
 def test_gemini_client():
     """Test the Gemini client"""
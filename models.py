@@ -1,7 +1,12 @@
 import psycopg2
 import psycopg2.extras
 from datetime import datetime
+import atexit
+import logging
 import os
+import threading
+
+logger = logging.getLogger(__name__)
 
 class Database:
     """Database connection and operations class"""
@@ -9,6 +14,10 @@ class Database:
     def __init__(self):
         self.connection = None
         self.cursor = None
+        # The shared cursor is not safe to use from several threads at once
+        self.lock = threading.RLock()
+        # Names of server-side prepared statements on the current connection
+        self.prepared = set()
     
     def connect(self):
         """Establish database connection"""
@@ -18,11 +27,12 @@ class Database:
                 raise ValueError("DATABASE_URL environment variable not set")
             
             self.connection = psycopg2.connect(database_url)
+            self.prepared = set()
             self.cursor = self.connection.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-            print("Database connection established successfully")
+            logger.info("Database connection established successfully")
             return True
         except Exception as e:
-            print(f"Error connecting to database: {e}")
+            logger.error("Error connecting to database: %s", e)
             return False
     
     def disconnect(self):
@@ -31,7 +41,7 @@ class Database:
             self.cursor.close()
         if self.connection:
             self.connection.close()
-        print("Database connection closed")
+        logger.info("Database connection closed")
     
     def create_tables(self):
         """Create necessary database tables"""
@@ -46,44 +56,96 @@ class Database:
             """
             self.cursor.execute(create_table_query)
             self.connection.commit()
-            print("Tables created successfully")
+            logger.info("Tables created successfully")
             return True
-        except Exception as e:
-            print(f"Error creating tables: {e}")
+        except Exception:
+            logger.exception("Error creating tables")
             return False
     
     def save_message(self, user_message, ai_response):
         """Save a chat message to the database"""
-        try:
-            insert_query = """
-            INSERT INTO messages (user_message, ai_response)
-            VALUES (%s, %s)
-            RETURNING id, timestamp;
-            """
-            self.cursor.execute(insert_query, (user_message, ai_response))
-            result = self.cursor.fetchone()
-            self.connection.commit()
-            return result
-        except Exception as e:
-            print(f"Error saving message: {e}")
-            self.connection.rollback()
-            return None
+        with self.lock:
+            try:
+                insert_query = """
+                INSERT INTO messages (user_message, ai_response)
+                VALUES (%s, %s)
+                RETURNING id, timestamp;
+                """
+                self.cursor.execute(insert_query, (user_message, ai_response))
+                result = self.cursor.fetchone()
+                self.connection.commit()
+                return result
+            except Exception:
+                logger.exception("Error saving message")
+                self.connection.rollback()
+                return None
+    
+    def save_messages(self, rows):
+        """Save several chat messages in a single round trip
+        
+        Args:
+            rows: List of (user_message, ai_response, timestamp) tuples
+            
+        Returns:
+            Number of rows written
+        """
+        with self.lock:
+            try:
+                insert_query = """
+                INSERT INTO messages (user_message, ai_response, timestamp)
+                VALUES %s;
+                """
+                psycopg2.extras.execute_values(self.cursor, insert_query, rows, page_size=len(rows))
+                self.connection.commit()
+                return len(rows)
+            except Exception:
+                logger.exception("Error saving message batch, retrying row by row")
+                self.connection.rollback()
+            
+            # One bad row must not cost the rest of the batch
+            saved = 0
+            for row in rows:
+                try:
+                    self.cursor.execute("""
+                    INSERT INTO messages (user_message, ai_response, timestamp)
+                    VALUES (%s, %s, %s);
+                    """, row)
+                    self.connection.commit()
+                    saved += 1
+                except Exception:
+                    logger.exception("Error saving message")
+                    self.connection.rollback()
+            return saved
     
     def get_recent_messages(self, limit=10):
         """Get recent chat messages from the database"""
-        try:
-            select_query = """
-            SELECT id, user_message, ai_response, timestamp
-            FROM messages
-            ORDER BY timestamp DESC
-            LIMIT %s;
-            """
-            self.cursor.execute(select_query, (limit,))
-            messages = self.cursor.fetchall()
-            return messages
-        except Exception as e:
-            print(f"Error fetching messages: {e}")
-            return []
+        with self.lock:
+            try:
+                self._prepare('recent_messages', """
+                SELECT id, user_message, ai_response, timestamp
+                FROM messages
+                ORDER BY timestamp DESC
+                LIMIT $1
+                """, 'int')
+                self.cursor.execute("EXECUTE recent_messages (%s);", (limit,))
+                messages = self.cursor.fetchall()
+                return messages
+            except Exception:
+                logger.exception("Error fetching messages")
+                self.connection.rollback()
+                self.prepared.discard('recent_messages')
+                return []
+    
+    def _prepare(self, name, query, *param_types):
+        """Create a server-side prepared statement once per connection"""
+        if name in self.prepared:
+            return
+        # The statement may survive a rolled back transaction, so check before preparing
+        self.cursor.execute("SELECT 1 FROM pg_prepared_statements WHERE name = %s;", (name,))
+        if not self.cursor.fetchone():
+            types = f" ({', '.join(param_types)})" if param_types else ""
+            self.cursor.execute(f"PREPARE {name}{types} AS {query};")
+        self.prepared.add(name)
     
     def get_message_count(self):
         """Get total number of messages in the database"""
@@ -92,9 +154,82 @@ class Database:
             self.cursor.execute(count_query)
             result = self.cursor.fetchone()
             return result['count'] if result else 0
-        except Exception as e:
-            print(f"Error getting message count: {e}")
+        except Exception:
+            logger.exception("Error getting message count")
             return 0
 
+class MessageWriter:
+    """Write-behind buffer that saves chat messages in batches"""
+    
+    # Stored in place of a missing AI response, since the column is NOT NULL
+    MISSING_RESPONSE = "I'm sorry, something went wrong. Please try again."
+    
+    def __init__(self, database, batch_size=50, flush_interval=0.2):
+        """
+        Initialize message writer
+        
+        Args:
+            database: Database instance used for the writes
+            batch_size: Flush as soon as this many messages are buffered
+            flush_interval: Seconds to wait before flushing a partial batch
+        """
+        self.database = database
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._timer = None
+    
+    def save_message(self, user_message, ai_response):
+        """Buffer a chat message; it is written on the next flush"""
+        rows = None
+        with self._lock:
+            self._buffer.append((
+                self._clean(user_message, ''),
+                self._clean(ai_response, self.MISSING_RESPONSE),
+                datetime.now()
+            ))
+            if len(self._buffer) >= self.batch_size:
+                rows = self._take_buffer()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if rows:
+            self._write(rows)
+    
+    @staticmethod
+    def _clean(value, default):
+        """Make a value storable in a TEXT column: no None, no NUL characters"""
+        if value is None:
+            return default
+        return str(value).replace('\x00', '')
+    
+    def flush(self):
+        """Write all buffered messages now"""
+        with self._lock:
+            rows = self._take_buffer()
+        if rows:
+            self._write(rows)
+    
+    def _take_buffer(self):
+        """Detach the current buffer and cancel the pending flush (caller holds the lock)"""
+        rows, self._buffer = self._buffer, []
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        return rows
+    
+    def _write(self, rows):
+        """Send one batch to the database"""
+        if not self.database.connection:
+            logger.warning("Dropping %d buffered messages: no database connection", len(rows))
+            return
+        self.database.save_messages(rows)
+
 # Global database instance
 db = Database()
+
+# Global write-behind buffer for chat messages
+message_writer = MessageWriter(db)
+atexit.register(message_writer.flush)
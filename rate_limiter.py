@@ -2,9 +2,10 @@
 Simple rate limiter to help manage API quota usage.
 """
 
+import threading
 import time
-from collections import defaultdict, deque
-from typing import Dict, Deque
+from collections import defaultdict
+from typing import Dict, Any
 
 class RateLimiter:
     """Simple rate limiter for API calls"""
@@ -19,7 +20,12 @@ class RateLimiter:
         """
         self.max_requests = max_requests
         self.time_window = time_window
-        self.requests: Dict[str, Deque[float]] = defaultdict(deque)
+        # Per key: ring buffer of the last max_requests timestamps; "head" is the oldest slot
+        self.requests: Dict[str, Dict[str, Any]] = defaultdict(
+            lambda: {"buf": [0.0] * self.max_requests, "head": 0}
+        )
+        # Idle keys are dropped at most once per time window
+        self._next_sweep = 0.0
     
     def is_allowed(self, key: str = "default") -> bool:
         """
@@ -32,19 +38,28 @@ class RateLimiter:
             True if request is allowed, False otherwise
         """
         now = time.time()
-        request_times = self.requests[key]
+        if now >= self._next_sweep:
+            self._evict_idle(now)
+        state = self.requests[key]
+        head = state["head"]
         
-        # Remove old requests outside time window
-        while request_times and request_times[0] <= now - self.time_window:
-            request_times.popleft()
-        
-        # Check if we can make another request
-        if len(request_times) < self.max_requests:
-            request_times.append(now)
+        # Allowed once the request max_requests ago has left the time window
+        if now - state["buf"][head] >= self.time_window:
+            state["buf"][head] = now
+            state["head"] = (head + 1) % self.max_requests
             return True
         
         return False
     
+    def _evict_idle(self, now: float) -> None:
+        """Forget keys whose newest request has left the time window"""
+        cutoff = now - self.time_window
+        idle = [key for key, state in self.requests.items()
+                if state["buf"][state["head"] - 1] <= cutoff]
+        for key in idle:
+            del self.requests[key]
+        self._next_sweep = now + self.time_window
+    
     def get_retry_after(self, key: str = "default") -> int:
         """
         Get seconds to wait before next request is allowed
@@ -55,12 +70,42 @@ class RateLimiter:
         Returns:
             Seconds to wait
         """
-        if not self.requests[key]:
+        state = self.requests.get(key)
+        if state is None:
             return 0
         
-        oldest_request = self.requests[key][0]
+        oldest_request = state["buf"][state["head"]]
         retry_after = int(self.time_window - (time.time() - oldest_request))
         return max(0, retry_after)
 
+class ShardedRateLimiter:
+    """Thread-safe rate limiter that spreads keys over independently locked shards"""
+    
+    def __init__(self, shards: int = 16, **kwargs):
+        """
+        Initialize sharded rate limiter
+        
+        Args:
+            shards: Number of independent shards
+            **kwargs: Passed through to each shard's RateLimiter
+        """
+        self.shards = [(RateLimiter(**kwargs), threading.Lock()) for _ in range(shards)]
+    
+    def _shard(self, key: str):
+        """Return the (limiter, lock) pair responsible for key"""
+        return self.shards[hash(key) % len(self.shards)]
+    
+    def is_allowed(self, key: str = "default") -> bool:
+        """Check if request is allowed (see RateLimiter.is_allowed)"""
+        limiter, lock = self._shard(key)
+        with lock:
+            return limiter.is_allowed(key)
+    
+    def get_retry_after(self, key: str = "default") -> int:
+        """Get seconds to wait before next request is allowed (see RateLimiter.get_retry_after)"""
+        limiter, lock = self._shard(key)
+        with lock:
+            return limiter.get_retry_after(key)
+
 # Global rate limiter instance
-rate_limiter = RateLimiter(max_requests=5, time_window=60)  # 5 requests per minute
+rate_limiter = ShardedRateLimiter(max_requests=5, time_window=60)  # 5 requests per minute
@@ -6,7 +6,23 @@ This script provides an easy way to start the application with proper configurat
 
 import os
 import sys
-from app import create_app
+from dotenv import find_dotenv, load_dotenv
+
+def run_production(host, port):
+    """Replace this process with Gunicorn running threaded workers."""
+    workers = os.environ.get('WEB_CONCURRENCY') or str(os.cpu_count() or 1)
+    threads = os.environ.get('GUNICORN_THREADS') or '32'
+    
+    print(f"🚀 Starting Gunicorn: {workers} workers x {threads} threads on {host}:{port}")
+    sys.stdout.flush()
+    os.execvp('gunicorn', [
+        'gunicorn',
+        '-k', 'gthread',
+        '-w', workers,
+        '--threads', threads,
+        '-b', f'{host}:{port}',
+        'app:app'
+    ])
 
 def main():
     """Main function to run the application."""
@@ -20,12 +36,24 @@ def main():
         print("   cp env.example .env")
         print()
     
-    # Create and run the application
-    app = create_app()
+    # Load .env before reading any settings (app import is deferred, so config.py has not run yet)
+    load_dotenv(find_dotenv(usecwd=True))
     
     # Get configuration
     port = int(os.environ.get('PORT', 5000))
     host = os.environ.get('HOST', '127.0.0.1')
+    
+    # The Werkzeug dev server handles one request at a time; use Gunicorn outside development
+    if os.environ.get('FLASK_ENV', 'development') != 'development':
+        try:
+            run_production(host, port)
+        except FileNotFoundError:
+            print("❌ Gunicorn not found. Install it with: pip install gunicorn")
+            sys.exit(1)
+    
+    # Create and run the application (imported here so Gunicorn builds its own app)
+    from app import create_app
+    app = create_app()
     debug = app.config.get('DEBUG', False)
     
     print(f"🌐 Application will be available at: http://{host}:{port}")
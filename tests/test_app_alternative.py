@@ -0,0 +1,230 @@
+import pytest
+import os
+import sys
+import json
+import time
+from datetime import datetime
+from unittest.mock import MagicMock
+
+# Add the parent directory to the path so we can import our app
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app_alternative
+from config import config
+from models import db
+from rate_limiter import ShardedRateLimiter
+
+@pytest.fixture
+def app(monkeypatch):
+    """Create an app instance backed by a mocked Gemini client."""
+    os.environ['FLASK_ENV'] = 'testing'
+    monkeypatch.setattr(config['testing'], 'GEMINI_API_KEY', 'test-api-key')
+    monkeypatch.setattr(app_alternative, 'GeminiClient', MagicMock())
+    monkeypatch.setattr(app_alternative, 'rate_limiter', ShardedRateLimiter(max_requests=5, time_window=60))
+    app = app_alternative.create_app()
+    app.config['TESTING'] = True
+    yield app
+
+@pytest.fixture
+def client(app):
+    """A test client for the app."""
+    return app.test_client()
+
+def read_events(response):
+    """Decode the Server-Sent Events in a streamed response."""
+    frames = response.get_data(as_text=True).split('\n\n')
+    return [json.loads(frame[len('data: '):]) for frame in frames if frame]
+
+class TestChatEndpoint:
+    """Test the chat endpoint."""
+    
+    def test_chat_success(self, app, client):
+        """Test successful chat request."""
+        app.gemini_client.generate_content.return_value = "Hello! How can I help you today?"
+        
+        response = client.post('/api/chat', json={'message': 'Hello'})
+        
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['user_message'] == 'Hello'
+        assert data['ai_response'] == "Hello! How can I help you today?"
+        assert 'timestamp' in data
+    
+    def test_chat_empty_message(self, client):
+        """Test chat with empty message."""
+        response = client.post('/api/chat', json={'message': '   '})
+        
+        assert response.status_code == 400
+        assert 'error' in response.get_json()
+    
+    def test_chat_malformed_body(self, client):
+        """Test that non-JSON or non-object bodies are rejected with 400."""
+        assert client.post('/api/chat', data='not json', content_type='application/json').status_code == 400
+        assert client.post('/api/chat', json=['Hello']).status_code == 400
+        assert client.post('/api/chat', json={'message': 42}).status_code == 400
+    
+    def test_chat_rate_limited(self, app, client):
+        """Test that clients over the limit get 429 with Retry-After."""
+        app.gemini_client.generate_content.return_value = "Hi"
+        for _ in range(5):
+            assert client.post('/api/chat', json={'message': 'Hello'}).status_code == 200
+        
+        response = client.post('/api/chat', json={'message': 'Hello'})
+        
+        assert response.status_code == 429
+        assert 'Retry-After' in response.headers
+    
+    def test_rate_limit_ignores_spoofed_headers(self, app, client):
+        """Test that the limit keys on the address the proxy appended, not client headers."""
+        app.gemini_client.generate_content.return_value = "Hi"
+        for i in range(5):
+            headers = {'X-Real-IP': f'10.0.0.{i}', 'X-Forwarded-For': f'10.0.0.{i}, 203.0.113.7'}
+            assert client.post('/api/chat', json={'message': 'Hello'}, headers=headers).status_code == 200
+        
+        spoofed = {'X-Real-IP': '10.0.0.99', 'X-Forwarded-For': '10.0.0.99, 203.0.113.7'}
+        assert client.post('/api/chat', json={'message': 'Hello'}, headers=spoofed).status_code == 429
+        other = {'X-Forwarded-For': '203.0.113.8'}
+        assert client.post('/api/chat', json={'message': 'Hello'}, headers=other).status_code == 200
+
+class TestMessageSaving:
+    """Test that chat exchanges are saved off the request path."""
+    
+    def test_chat_saves_in_background(self, app, client, monkeypatch):
+        """Test that the exchange reaches the message writer after the response."""
+        writer = MagicMock()
+        monkeypatch.setattr(app_alternative, 'message_writer', writer)
+        monkeypatch.setattr(db, 'connection', object())
+        app.gemini_client.generate_content.return_value = "Hello!"
+        
+        response = client.post('/api/chat', json={'message': 'Hi'})
+        
+        assert response.status_code == 200
+        deadline = time.monotonic() + 5
+        while not writer.save_message.called and time.monotonic() < deadline:
+            time.sleep(0.01)
+        writer.save_message.assert_called_once_with('Hi', 'Hello!')
+
+class TestChatStreamEndpoint:
+    """Test the streaming chat endpoint."""
+    
+    def test_stream_success(self, app, client):
+        """Test that deltas are streamed and followed by a done event."""
+        app.gemini_client.stream_content.return_value = iter(['Hello', ' there', '!'])
+        
+        response = client.post('/api/chat/stream', json={'message': 'Hello'})
+        
+        assert response.status_code == 200
+        assert response.mimetype == 'text/event-stream'
+        events = read_events(response)
+        assert ''.join(e.get('delta', '') for e in events) == 'Hello there!'
+        assert events[-1]['done'] is True
+    
+    def test_stream_groups_small_deltas(self, app, client):
+        """Test that small deltas are grouped into larger frames."""
+        app.gemini_client.stream_content.return_value = iter(['a'] * 120)
+        
+        events = read_events(client.post('/api/chat/stream', json={'message': 'Hello'}))
+        
+        deltas = [e['delta'] for e in events if 'delta' in e]
+        assert len(deltas) == 3
+        assert ''.join(deltas) == 'a' * 120
+    
+    def test_stream_failure_midway(self, app, monkeypatch):
+        """Test that a cut-off stream ends with an error event and is not saved."""
+        # Rebuild the app so it binds the patched submit
+        submit = MagicMock()
+        monkeypatch.setattr(app_alternative._save_pool, 'submit', submit)
+        monkeypatch.setattr(db, 'connection', object())
+        app = app_alternative.create_app()
+        
+        def deltas():
+            yield 'Hello'
+            raise ConnectionError("connection reset")
+        app.gemini_client.stream_content.return_value = deltas()
+        
+        events = read_events(app.test_client().post('/api/chat/stream', json={'message': 'Hello'}))
+        
+        assert 'error' in events[-1]
+        assert not any(e.get('done') for e in events)
+        submit.assert_not_called()
+    
+    def test_stream_empty_message(self, client):
+        """Test streaming with empty message."""
+        response = client.post('/api/chat/stream', json={'message': ''})
+        
+        assert response.status_code == 400
+
+class TestHistoryEndpoint:
+    """Test the chat history endpoint."""
+    
+    def test_history_serializes_rows(self, client, monkeypatch):
+        """Test that database rows are returned with ISO timestamps."""
+        timestamp = datetime(2024, 1, 2, 3, 4, 5, 678901)
+        rows = [{'id': 1, 'user_message': 'Hi', 'ai_response': 'Hello!', 'timestamp': timestamp}]
+        monkeypatch.setattr(db, 'connection', object())
+        monkeypatch.setattr(db, 'get_recent_messages', MagicMock(return_value=rows))
+        
+        response = client.get('/api/history?limit=5')
+        
+        assert response.status_code == 200
+        message = response.get_json()['messages'][0]
+        assert message['id'] == 1
+        assert message['user_message'] == 'Hi'
+        assert message['ai_response'] == 'Hello!'
+        assert message['timestamp'] == timestamp.isoformat()
+        db.get_recent_messages.assert_called_once_with(5)
+    
+    def test_large_history_is_compressed(self, client, monkeypatch):
+        """Test that large responses are compressed for clients that accept it."""
+        rows = [{'id': i, 'user_message': 'Hi', 'ai_response': 'Hello!', 'timestamp': datetime(2024, 1, 1)}
+                for i in range(50)]
+        monkeypatch.setattr(db, 'connection', object())
+        monkeypatch.setattr(db, 'get_recent_messages', MagicMock(return_value=rows))
+        
+        response = client.get('/api/history?limit=50', headers={'Accept-Encoding': 'gzip'})
+        
+        assert response.status_code == 200
+        assert response.headers['Content-Encoding'] == 'gzip'
+    
+    def test_small_response_is_not_compressed(self, client):
+        """Test that small responses are sent uncompressed."""
+        response = client.get('/api/health', headers={'Accept-Encoding': 'gzip'})
+        
+        assert 'Content-Encoding' not in response.headers
+
+class TestMainPage:
+    """Test the main page."""
+    
+    def test_index_page(self, client):
+        """Test that the index page loads with an ETag."""
+        response = client.get('/')
+        
+        assert response.status_code == 200
+        assert b'AI Chat Application' in response.data
+        assert response.headers['ETag']
+    
+    def test_index_not_modified(self, client):
+        """Test that a matching If-None-Match returns 304."""
+        etag = client.get('/').headers['ETag']
+        
+        response = client.get('/', headers={'If-None-Match': etag})
+        
+        assert response.status_code == 304
+        assert response.data == b''
+
+class TestHealthEndpoint:
+    """Test the health check endpoint."""
+    
+    def test_health_check(self, client):
+        """Test that health check reports service status."""
+        response = client.get('/api/health')
+        
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['status'] == 'healthy'
+        assert data['ai_available'] is True
+        assert 'timestamp' in data
+        assert 'database_connected' in data
+
+if __name__ == '__main__':
+    pytest.main([__file__])
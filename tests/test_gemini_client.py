@@ -0,0 +1,192 @@
+import pytest
+import os
+import sys
+import json
+import threading
+import time
+import requests
+from unittest.mock import MagicMock
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the parent directory to the path so we can import our client
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gemini_client import GeminiClient, ResponseCache
+
+def make_response(status_code=200, text="Hello!"):
+    """Build a fake HTTP response for the Gemini API."""
+    response = MagicMock()
+    response.status_code = status_code
+    response.content = json.dumps({
+        'candidates': [{'content': {'parts': [{'text': text}]}}]
+    }).encode()
+    return response
+
+@pytest.fixture
+def client():
+    """A Gemini client whose HTTP session is mocked."""
+    client = GeminiClient('test-api-key')
+    client._session = MagicMock()
+    client._session.post.return_value = make_response()
+    return client
+
+class TestResponseCache:
+    """Test the Gemini response cache."""
+    
+    def test_repeated_prompt_uses_cache(self, client):
+        """Test that an identical prompt does not hit the API twice."""
+        assert client.generate_content("Hello") == "Hello!"
+        assert client.generate_content("Hello") == "Hello!"
+        assert client._session.post.call_count == 1
+    
+    def test_cache_ignores_case_and_whitespace(self, client):
+        """Test that near-duplicate prompts share a cache entry."""
+        client.generate_content("Hello   there")
+        client.generate_content("hello there ")
+        assert client._session.post.call_count == 1
+    
+    def test_cache_is_per_model(self, client):
+        """Test that the same prompt on another model is not served from cache."""
+        client.generate_content("Hello", model="gemini-2.0-flash")
+        client.generate_content("Hello", model="gemini-1.5-flash")
+        assert client._session.post.call_count == 2
+    
+    def test_errors_are_not_cached(self, client):
+        """Test that fallback error messages are not cached."""
+        client._session.post.return_value = make_response(status_code=500)
+        client.generate_content("Hello")
+        client._session.post.return_value = make_response()
+        assert client.generate_content("Hello") == "Hello!"
+        assert client._session.post.call_count == 2
+    
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted when full."""
+        cache = ResponseCache(maxsize=2, ttl=60)
+        cache.set(b'a', 'A')
+        cache.set(b'b', 'B')
+        cache.get(b'a')
+        cache.set(b'c', 'C')
+        assert cache.get(b'a') == 'A'
+        assert cache.get(b'b') is None
+        assert cache.get(b'c') == 'C'
+    
+    def test_expired_entries_are_dropped(self):
+        """Test that entries past their TTL are not returned."""
+        cache = ResponseCache(maxsize=2, ttl=0)
+        cache.set(b'a', 'A')
+        assert cache.get(b'a') is None
+
+class TestSession:
+    """Test the pooled session's retry policy."""
+    
+    def test_read_errors_are_not_retried(self):
+        """Test that connect and 5xx errors retry but read timeouts do not."""
+        retries = GeminiClient('test-api-key')._session.get_adapter('https://example.com').max_retries
+        assert retries.read == 0
+        assert retries.connect is None and retries.total == 2
+        assert 503 in retries.status_forcelist
+
+class TestInflightDeduplication:
+    """Test that concurrent identical prompts share one API call."""
+    
+    def test_concurrent_identical_prompts(self, client):
+        """Test that callers arriving while a call is in flight wait for it."""
+        started = threading.Event()
+        release = threading.Event()
+        
+        def slow_post(*args, **kwargs):
+            started.set()
+            release.wait(timeout=5)
+            return make_response()
+        
+        client._session.post.side_effect = slow_post
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            leader = pool.submit(client.generate_content, "Hello")
+            started.wait(timeout=5)
+            followers = [pool.submit(client.generate_content, "Hello") for _ in range(2)]
+            # Give the followers time to register behind the in-flight call
+            while not all(f.running() for f in followers):
+                time.sleep(0.01)
+            time.sleep(0.05)
+            release.set()
+            results = [leader.result(timeout=5)] + [f.result(timeout=5) for f in followers]
+        
+        assert results == ["Hello!"] * 3
+        assert client._session.post.call_count == 1
+        assert client._inflight == {}
+    
+    def test_slot_released_on_failure(self, client):
+        """Test that an escaping exception is raised and the in-flight slot is released."""
+        client._session.post.side_effect = KeyboardInterrupt
+        with pytest.raises(KeyboardInterrupt):
+            client.generate_content("Hello")
+        assert client._inflight == {}
+
+class TestProbeModel:
+    """Test the model smoke-test call."""
+    
+    def test_probe_returns_text_on_success(self, client):
+        """Test that a working model returns its generated text."""
+        assert client.probe_model("gemini-2.0-flash") == "Hello!"
+    
+    @pytest.mark.parametrize('status_code', [404, 429, 500])
+    def test_probe_returns_none_on_api_error(self, client, status_code):
+        """Test that API errors are reported as None instead of a fallback message."""
+        client._session.post.return_value = make_response(status_code=status_code)
+        assert client.probe_model("no-such-model") is None
+    
+    def test_probe_returns_none_on_connection_error(self, client):
+        """Test that connection failures are reported as None."""
+        client._session.post.side_effect = requests.exceptions.ConnectionError("offline")
+        assert client.probe_model("gemini-2.0-flash") is None
+    
+    def test_probe_bypasses_cache(self, client):
+        """Test that a probe always reaches the API."""
+        client.generate_content("Hello, how are you?")
+        client.probe_model("gemini-2.0-flash")
+        assert client._session.post.call_count == 2
+
+class TestWarmup:
+    """Test connection warm-up."""
+    
+    def test_warmup_ignores_errors(self, client):
+        """Test that a failed warm-up does not raise."""
+        client._session.head.side_effect = requests.exceptions.ConnectionError("offline")
+        client.warmup()
+        client._session.head.assert_called_once()
+
+class TestStreamContent:
+    """Test streaming content generation."""
+    
+    def test_stream_yields_deltas(self, client):
+        """Test that SSE data frames are decoded into text deltas."""
+        response = make_response()
+        response.iter_lines.return_value = [
+            'data: {"candidates": [{"content": {"parts": [{"text": "Hel"}]}}]}',
+            '',
+            'data: {"candidates": [{"content": {"parts": [{"text": "lo!"}]}}]}',
+        ]
+        client._session.post.return_value.__enter__.return_value = response
+        
+        assert list(client.stream_content("Hello")) == ["Hel", "lo!"]
+        # The completed response is cached for the next identical prompt
+        assert client.generate_content("Hello") == "Hello!"
+        assert client._session.post.call_count == 1
+    
+    def test_stream_failure_midway_raises(self, client):
+        """Test that a connection error after some deltas is raised, not cached."""
+        def lines():
+            yield 'data: {"candidates": [{"content": {"parts": [{"text": "Hel"}]}}]}'
+            raise requests.exceptions.ChunkedEncodingError("connection reset")
+        response = make_response()
+        response.iter_lines.return_value = lines()
+        client._session.post.return_value.__enter__.return_value = response
+        
+        stream = client.stream_content("Hello")
+        assert next(stream) == "Hel"
+        with pytest.raises(requests.exceptions.ChunkedEncodingError):
+            next(stream)
+        assert client._cache.get(client._cache_key("gemini-2.0-flash", "Hello")) is None
+
+if __name__ == '__main__':
+    pytest.main([__file__])
@@ -0,0 +1,75 @@
+import pytest
+import os
+import sys
+from unittest.mock import MagicMock
+
+# Add the parent directory to the path so we can import our models
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import Database, MessageWriter
+
+@pytest.fixture
+def database():
+    """A fake database that records batched writes."""
+    database = MagicMock()
+    database.connection = object()
+    return database
+
+class TestMessageWriter:
+    """Test the write-behind message buffer."""
+    
+    def test_flushes_when_batch_is_full(self, database):
+        """Test that a full batch is written in one call."""
+        writer = MessageWriter(database, batch_size=2, flush_interval=60)
+        writer.save_message("Hi", "Hello!")
+        database.save_messages.assert_not_called()
+        writer.save_message("Bye", "Goodbye!")
+        database.save_messages.assert_called_once()
+        rows = database.save_messages.call_args[0][0]
+        assert [row[:2] for row in rows] == [("Hi", "Hello!"), ("Bye", "Goodbye!")]
+    
+    def test_flush_writes_partial_batch(self, database):
+        """Test that flush writes whatever is buffered."""
+        writer = MessageWriter(database, batch_size=50, flush_interval=60)
+        writer.save_message("Hi", "Hello!")
+        writer.flush()
+        database.save_messages.assert_called_once()
+        writer.flush()
+        database.save_messages.assert_called_once()
+    
+    def test_timer_flushes_partial_batch(self, database):
+        """Test that a partial batch is written after the flush interval."""
+        writer = MessageWriter(database, batch_size=50, flush_interval=0.01)
+        writer.save_message("Hi", "Hello!")
+        writer._timer.join(timeout=5)
+        database.save_messages.assert_called_once()
+    
+    def test_rows_are_cleaned_before_buffering(self, database):
+        """Test that NUL characters and a missing AI response are fixed up."""
+        writer = MessageWriter(database, batch_size=1, flush_interval=60)
+        writer.save_message("Hi\x00 there", None)
+        rows = database.save_messages.call_args[0][0]
+        assert rows[0][:2] == ("Hi there", MessageWriter.MISSING_RESPONSE)
+
+class TestSaveMessages:
+    """Test batched inserts into the messages table."""
+    
+    def test_bad_row_does_not_drop_the_batch(self, monkeypatch):
+        """Test that a failed batch insert falls back to one insert per row."""
+        database = Database()
+        database.connection = MagicMock()
+        database.cursor = MagicMock()
+        
+        def insert_row(query, row):
+            if row[1] is None:
+                raise ValueError("null value in column \"ai_response\"")
+        database.cursor.execute.side_effect = insert_row
+        monkeypatch.setattr('psycopg2.extras.execute_values', MagicMock(side_effect=ValueError("batch failed")))
+        
+        rows = [("Hi", "Hello!", None), ("Oops", None, None), ("Bye", "Goodbye!", None)]
+        assert database.save_messages(rows) == 2
+        assert database.cursor.execute.call_count == 3
+        assert database.connection.commit.call_count == 2
+
+if __name__ == '__main__':
+    pytest.main([__file__])
@@ -0,0 +1,88 @@
+import pytest
+import os
+import sys
+from unittest.mock import patch
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the parent directory to the path so we can import the rate limiter
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rate_limiter import RateLimiter, ShardedRateLimiter
+
+class TestRateLimiter:
+    """Test the sliding-window rate limiter."""
+    
+    @patch('rate_limiter.time.time')
+    def test_blocks_after_max_requests(self, mock_time):
+        """Test that requests beyond the limit are rejected within the window."""
+        mock_time.return_value = 1000.0
+        limiter = RateLimiter(max_requests=3, time_window=60)
+        assert [limiter.is_allowed("user") for _ in range(4)] == [True, True, True, False]
+    
+    @patch('rate_limiter.time.time')
+    def test_allows_again_after_window(self, mock_time):
+        """Test that a slot frees up once the oldest request leaves the window."""
+        limiter = RateLimiter(max_requests=2, time_window=60)
+        mock_time.return_value = 1000.0
+        assert limiter.is_allowed("user")
+        mock_time.return_value = 1030.0
+        assert limiter.is_allowed("user")
+        assert not limiter.is_allowed("user")
+        mock_time.return_value = 1060.0
+        assert limiter.is_allowed("user")
+        assert not limiter.is_allowed("user")
+    
+    @patch('rate_limiter.time.time')
+    def test_keys_are_independent(self, mock_time):
+        """Test that each key has its own limit."""
+        mock_time.return_value = 1000.0
+        limiter = RateLimiter(max_requests=1, time_window=60)
+        assert limiter.is_allowed("alice")
+        assert limiter.is_allowed("bob")
+        assert not limiter.is_allowed("alice")
+    
+    @patch('rate_limiter.time.time')
+    def test_retry_after(self, mock_time):
+        """Test the wait time reported for a blocked key."""
+        limiter = RateLimiter(max_requests=1, time_window=60)
+        assert limiter.get_retry_after("user") == 0
+        mock_time.return_value = 1000.0
+        limiter.is_allowed("user")
+        mock_time.return_value = 1020.0
+        assert limiter.get_retry_after("user") == 40
+
+    @patch('rate_limiter.time.time')
+    def test_idle_keys_are_evicted(self, mock_time):
+        """Test that keys with no request in the last window are dropped."""
+        mock_time.return_value = 1000.0
+        limiter = RateLimiter(max_requests=2, time_window=60)
+        limiter.is_allowed("alice")
+        mock_time.return_value = 1050.0
+        limiter.is_allowed("bob")
+        mock_time.return_value = 1070.0
+        limiter.is_allowed("carol")
+        assert set(limiter.requests) == {"bob", "carol"}
+
+class TestShardedRateLimiter:
+    """Test the thread-safe sharded rate limiter."""
+    
+    @patch('rate_limiter.time.time')
+    def test_limits_each_key(self, mock_time):
+        """Test that sharding preserves per-key limits."""
+        mock_time.return_value = 1000.0
+        limiter = ShardedRateLimiter(shards=4, max_requests=2, time_window=60)
+        for key in ("alice", "bob", "carol"):
+            assert limiter.is_allowed(key)
+            assert limiter.is_allowed(key)
+            assert not limiter.is_allowed(key)
+            assert limiter.get_retry_after(key) == 60
+    
+    def test_concurrent_requests_respect_limit(self):
+        """Test that concurrent callers cannot exceed the limit."""
+        limiter = ShardedRateLimiter(shards=4, max_requests=50, time_window=60)
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda _: limiter.is_allowed("user"), range(200)))
+        assert results.count(True) == 50
+
+if __name__ == '__main__':
+    pytest.main([__file__])
@@ -0,0 +1,53 @@
+import pytest
+import os
+import sys
+from unittest.mock import patch, MagicMock
+
+# Add the parent directory to the path so we can import the run script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import run
+
+@pytest.fixture
+def env(monkeypatch, tmp_path):
+    """Run from an empty directory with no server settings exported."""
+    monkeypatch.chdir(tmp_path)
+    # Restore the environment afterwards, since load_dotenv writes into os.environ
+    with patch.dict(os.environ):
+        for name in ('FLASK_ENV', 'PORT', 'HOST', 'WEB_CONCURRENCY', 'GUNICORN_THREADS'):
+            os.environ.pop(name, None)
+        yield tmp_path
+
+class TestRunScript:
+    """Test how run.py chooses between Gunicorn and the dev server."""
+    
+    @patch('run.os.execvp', side_effect=SystemExit(0))
+    def test_production_from_env_file(self, mock_execvp, env):
+        """Test that FLASK_ENV and PORT from .env start Gunicorn on that port."""
+        (env / '.env').write_text('FLASK_ENV=production\nPORT=8123\n')
+        
+        # execvp never returns; the mock stops main() the same way
+        with pytest.raises(SystemExit):
+            run.main()
+        
+        mock_execvp.assert_called_once()
+        args = mock_execvp.call_args[0][1]
+        assert args[0] == 'gunicorn'
+        assert '127.0.0.1:8123' in args
+        assert args[-1] == 'app:app'
+    
+    @patch('run.os.execvp')
+    def test_development_uses_dev_server(self, mock_execvp, env):
+        """Test that development mode runs the Flask dev server."""
+        (env / '.env').write_text('FLASK_ENV=development\n')
+        app = MagicMock()
+        app.config = {'DEBUG': True}
+        
+        with patch.dict(sys.modules, {'app': MagicMock(create_app=MagicMock(return_value=app))}):
+            run.main()
+        
+        mock_execvp.assert_not_called()
+        app.run.assert_called_once_with(host='127.0.0.1', port=5000, debug=True)
+
+if __name__ == '__main__':
+    pytest.main([__file__])